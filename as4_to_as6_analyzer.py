@@ -1,4 +1,5 @@
 import argparse
+import io
 import os
 import sys
 import time
@@ -7,8 +8,36 @@ from pathlib import Path
 from checks import *
 from utils import utils
 
-
-def parse_args():
+# Checks run in this order after the project name validation.
+# Each entry names the project location the check is pointed at.
+CHECKS = (
+    # Generic file compatibility checks
+    (check_files_for_compatibility, "project"),
+    # Hardware & configuration checks
+    (check_ar, "physical"),
+    (check_uad_files, "physical"),
+    # Also reports file devices and ftp configurations from the same .hw scan
+    (check_hardware, "physical"),
+    # Software/libraries/function checks
+    (check_libraries, "logical"),
+    (check_functions, "logical"),
+    # Access & Security (UserRoleSystem + ANSL in .hw)
+    (check_access_security, "physical"),
+    # Special-domain checks
+    (check_safety, "apj"),  # Safety system issues
+    (check_vision_settings, "apj"),  # mappVision issues
+    (check_mappView, "apj"),  # mappView issues
+    # Detect widget libraries (WDK usage or User Widget Libraries from AS4)
+    (check_widget_lib_usage, "logical"),
+    (check_mapp_version, "apj"),  # mappService/mapp version issues
+    (check_scene_viewer, "apj"),  # Scene Viewer usage & requirements
+)
+
+
+def parse_args(argv=None):
+    """
+    Parses the command line arguments, or the given argument list if argv is set.
+    """
     parser = argparse.ArgumentParser(
         prog=os.path.basename(__file__),
         description="Scans Automation Studio project for transition from AS4 to AS6",
@@ -37,20 +66,28 @@ def parse_args():
         action="store_true",
         help="Do not write a result file; log only to console/UI.",
     )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse the results of unchanged files from the previous run. "
+        "The cache is stored as 'as4_to_as6_analyzer_cache.json' in the project folder.",
+    )
     parser.add_argument(
         "--output",
         type=str,
         help="Custom output file path. If not provided, defaults to 'as4_to_as6_analyzer_result.txt' in the project folder.",
     )
     # Parse the arguments
+    if argv is None:
+        argv = sys.argv[1:]
 
     # Fallback if no arguments are provided (e.g. when run from GUI)
-    if len(sys.argv) == 1:
+    if not argv:
         # Default to current directory as project path, verbose on,
         # and NO file output when launched via GUI.
-        sys.argv += [".", "-v", "--no-file"]
+        argv = [".", "-v", "--no-file"]
 
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def open_output_file(project_path, no_file, custom_output):
@@ -80,16 +117,17 @@ def open_output_file(project_path, no_file, custom_output):
 
 
 # Update main function to handle project directory input and optional verbose flag
-def main():
+def main(argv=None):
     """
     Main function to scan for obsolete libraries, function blocks, functions, and unsupported hardware.
     Writes to a file only when requested; otherwise logs to console/UI only.
+    argv can be used to pass the arguments directly instead of reading them from sys.argv.
     """
 
     build_version = utils.get_version()
     utils.log(f"Script version: {build_version}")
 
-    args = parse_args()
+    args = parse_args(argv)
     apj_file = utils.get_and_check_project_file(args.project_path)
 
     utils.log(f"Project path validated: {args.project_path}")
@@ -102,9 +140,21 @@ def main():
         args.project_path, args.no_file, args.output
     )
 
+    # Every check walking Logical/ or Physical/ shares one walk per folder,
+    # the CPU-bound scans share one set of worker processes
+    utils.enable_file_index()
+    utils.enable_process_pool()
+    if args.cache:
+        utils.enable_scan_cache(
+            Path(args.project_path) / "as4_to_as6_analyzer_cache.json"
+        )
+
+    # The file output is collected in memory and written in one go at the end
+    file_buffer = io.StringIO() if file_handle else None
+
     # Unified logger: always logs to console; optionally mirrors to file if file_handle is set.
     def log(message, when="", severity=""):
-        utils.log(message, log_file=file_handle, when=when, severity=severity)
+        utils.log(message, log_file=file_buffer, when=when, severity=severity)
 
     try:
         log(
@@ -116,39 +166,15 @@ def main():
         check_project_path_and_name(args.project_path, apj_file, log, args.verbose)
 
         # Resolve key paths
-        apj_path = Path(args.project_path) / apj_file
-        logical_path = Path(args.project_path) / "Logical"
-        physical_path = Path(args.project_path) / "Physical"
-
-        # Generic file compatibility checks
-        check_files_for_compatibility(args.project_path, log, args.verbose)
-
-        # Hardware & configuration checks
-        check_ar(physical_path, log, args.verbose)
-        check_uad_files(physical_path, log, args.verbose)
-        check_hardware(physical_path, log, args.verbose)
-        check_file_devices(physical_path, log, args.verbose)
-
-        # Software/libraries/function checks
-        check_libraries(logical_path, log, args.verbose)
-        check_functions(logical_path, log, args.verbose)
-
-        # Access & Security (UserRoleSystem + ANSL in .hw)
-        check_access_security(physical_path, log, args.verbose)
-
-        # Special-domain checks
-        check_safety(apj_path, log, args.verbose)  # Safety system issues
-        check_vision_settings(apj_path, log, args.verbose)  # mappVision issues
-        check_mappView(apj_path, log, args.verbose)  # mappView issues
-        check_widget_lib_usage(
-            logical_path, log, args.verbose
-        )  # Detect widget libraries (WDK usage or User Widget Libraries from AS4)
-        check_mapp_version(
-            apj_path, log, args.verbose
-        )  # mappService/mapp version issues
-        check_scene_viewer(
-            apj_path, log, args.verbose
-        )  # Scene Viewer usage & requirements
+        paths = {
+            "project": args.project_path,
+            "apj": Path(args.project_path) / apj_file,
+            "logical": Path(args.project_path) / "Logical",
+            "physical": Path(args.project_path) / "Physical",
+        }
+
+        for check, location in CHECKS:
+            check(paths[location], log, args.verbose)
 
         # Finish up
 
@@ -175,18 +201,23 @@ def main():
         utils.log(error_message, severity="ERROR")
 
         # Append to file only if file output was enabled
-        if output_file:
-            try:
-                with open(output_file, "a", encoding="utf-8") as error_log:
-                    error_log.write(f"\n[ERROR] {error_message}\n")
-            except Exception as log_error:
-                utils.log(
-                    f"Failed to write error to log file: {log_error}", severity="ERROR"
-                )
+        if file_buffer is not None:
+            file_buffer.write(f"\n[ERROR] {error_message}\n")
 
     finally:
-        # Close the file handle if we opened one
+        utils.save_scan_cache()
+        utils.shutdown_process_pool()
+        utils.disable_file_index()
+
+        # Write the collected output and close the file handle if we opened one
         if file_handle:
+            try:
+                file_handle.write(file_buffer.getvalue())
+            except Exception as write_error:
+                utils.log(
+                    f"Failed to write results to '{output_file}': {write_error}",
+                    severity="ERROR",
+                )
             try:
                 file_handle.close()
             except Exception:
@@ -3,7 +3,6 @@ from .automation_runtime import check_ar
 from .common import check_project_path_and_name
 from .deprecated_functions import check_functions
 from .file_compatibility import check_files_for_compatibility
-from .file_device_check import check_file_devices
 from .hardware_check import check_hardware
 from .library_check import check_libraries
 from .mapp_control import check_mapp_control
@@ -1,18 +1,23 @@
 # checks/access_security.py
+import os
 import re
 from pathlib import Path
 
 from utils import utils
 
+# Enabled ANSL authentication parameter in a .hw file
+ANSL_AUTHENTICATION_PATTERN = re.compile(
+    rb'ID\s*=\s*["\']AnslAuthentication["\']\s+[^>]*Value\s*=\s*["\']1["\']',
+    re.IGNORECASE,
+)
+
 
 def process_ansl_authentication(file_path):
     """Return [("AnslAuthentication", file_path)] if Value=\"1\" is present, else []."""
-    content = utils.read_file(Path(file_path))
-    pat = re.compile(
-        r'ID\s*=\s*["\']AnslAuthentication["\']\s+[^>]*Value\s*=\s*["\']1["\']',
-        re.IGNORECASE,
-    )
-    return [("AnslAuthentication", file_path)] if pat.search(content) else []
+    with utils.map_file(file_path) as content:
+        if ANSL_AUTHENTICATION_PATTERN.search(content):
+            return [("AnslAuthentication", file_path)]
+    return []
 
 
 def _find_user_role_system_dirs_deep(physical_path: Path):
@@ -23,17 +28,21 @@ def _find_user_role_system_dirs_deep(physical_path: Path):
     result = {}
     if not physical_path or not Path(physical_path).exists():
         return result
-    for urs in physical_path.rglob("UserRoleSystem"):
-        if not urs.is_dir():
+    # Walk directory names only, a Path is built just for the matches.
+    # Folder names are compared case-insensitively, as Windows treats them.
+    for root, dirs, _files in os.walk(physical_path):
+        if os.path.basename(root).casefold() != "accessandsecurity":
             continue
-        if urs.parent.name != "AccessAndSecurity":
+        found = next((d for d in dirs if d.casefold() == "userrolesystem"), None)
+        if found is None:
+            # Keep looking further down, a UserRoleSystem may be nested deeper
             continue
+        # The folder's UserRoleSystem is found, its user and role files need no walk
+        dirs.clear()
+        urs = Path(root, found)
         # derive top-level configuration name (first path segment under Physical/)
-        try:
-            rel = urs.relative_to(physical_path)
-            config_name = rel.parts[0] if rel.parts else "(unknown)"
-        except Exception:
-            config_name = "(unknown)"
+        rel = os.path.relpath(urs, physical_path)
+        config_name = rel.split(os.sep, 1)[0]
         result.setdefault(config_name, []).append(urs)
     return result
 
@@ -92,6 +101,7 @@ def check_access_security(physical_path: Path, log, verbose: bool = False):
         physical_path,
         [".hw"],
         process_ansl_authentication,
+        cache_version=1,
     )
 
     if ansl_results:
@@ -6,7 +6,7 @@ from utils import utils
 
 MIN_LETTER = "B"
 MIN_VERSION = 4.25
-AR_VERSION_PATTERN = r'<AutomationRuntime Version="([A-Z])(\d+\.\d+)"\s*/>'
+AR_VERSION_PATTERN = re.compile(rb'<AutomationRuntime Version="([A-Z])(\d+\.\d+)"\s*/>')
 
 
 def _parse_version(version_str: str) -> Optional[float]:
@@ -30,12 +30,14 @@ def check_ar(physical_path: Path, log, verbose: bool = False) -> None:
             continue
 
         config = file.parts[-3]
-        content = utils.read_file(file)
-        ar_match = re.search(AR_VERSION_PATTERN, content)
-
-        if ar_match:
-            letter = ar_match.group(1)
-            version = _parse_version(ar_match.group(2))
+        with utils.map_file(file) as content:
+            ar_match = AR_VERSION_PATTERN.search(content)
+            # Copy the groups out while the file is still mapped
+            ar_groups = ar_match.groups() if ar_match else None
+
+        if ar_groups:
+            letter = ar_groups[0].decode()
+            version = _parse_version(ar_groups[1].decode())
 
             if _is_version_valid(letter, version):
                 if verbose:
@@ -1,7 +1,15 @@
 import re
+import string
 
 from utils import utils
 
+# Characters allowed in the project path. Translating a path with this table deletes every
+# allowed character, so anything left over is invalid.
+PROJECT_PATH_CHARACTERS = string.ascii_letters + string.digits + "_ :\\/!(){}+-@.^="
+PROJECT_PATH_STRIP = str.maketrans("", "", PROJECT_PATH_CHARACTERS)
+# Project file name, e.g. MyProject.apj
+PROJECT_NAME_PATTERN = re.compile(r"\w+\.apj\Z", re.ASCII)
+
 
 # Check the project name and path for invalid characters
 # As opposed to what's in the help, we need to allow : and \ and / as well since these are valid
@@ -9,10 +17,10 @@ from utils import utils
 def check_project_path_and_name(path, name, log, verbose=False):
     log("─" * 80 + "\nChecking path and project for invalid characters...")
 
-    project_name_pattern = r"^(\w+)\.apj$"
-    project_path_pattern = r"^[\w :\\/!(){}+\-@\.\^=]+$"
-    if not re.fullmatch(project_path_pattern, path, flags=re.ASCII) or not re.fullmatch(
-        project_name_pattern, name, flags=re.ASCII
+    if (
+        not path
+        or path.translate(PROJECT_PATH_STRIP)
+        or not PROJECT_NAME_PATTERN.match(name)
     ):
         log(
             "Invalid path or project name, see AS4/Migration",
@@ -1,86 +1,31 @@
+import functools
 import re
-from pathlib import Path
 from utils import utils
 
+# Function block declaration in a .var/.typ file, e.g. "fbAlarm : MpAlarmXConfigMapping;"
+DECLARATION_TYPE_PATTERN = re.compile(r":\s*([A-Za-z0-9_]+)\s*;")
+# Any identifier in a source file
+IDENTIFIER_PATTERN = re.compile(r"\b([A-Za-z0-9_]+)\b")
 
-def check_deprecated_string_functions(root_dir, extensions, deprecated_functions):
-    """
-    Scans all .st files in the project directory for deprecated string functions.
 
-    Returns:
-        list: A list of file paths where deprecated string functions were found.
+@functools.lru_cache(maxsize=None)
+def _function_pattern(functions, suffix=""):
     """
-    deprecated_files = []
-
-    for ext in extensions:
-        for path in Path(root_dir).rglob(f"*{ext}"):
-            if path.is_file():
-                content = utils.read_file(path)
-                if any(
-                    re.search(rf"\b{func}\b", content) for func in deprecated_functions
-                ):
-                    deprecated_files.append(str(path))
-
-    return deprecated_files
-
-
-def check_deprecated_math_functions(root_dir, extensions, deprecated_functions):
+    Compiles one alternation matching any of the given function names as a whole word,
+    optionally followed by suffix. functions must be a tuple so the pattern can be cached.
     """
-    Scans files for deprecated math function calls.
+    return re.compile(r"\b(?:" + "|".join(map(re.escape, functions)) + r")\b" + suffix)
 
-    Args:
-        root_dir (Path): The root directory to search in.
-        extensions (list): List of file extensions to check.
-        deprecated_functions (set): Set of deprecated math functions.
 
-    Returns:
-        list: A list of file paths where deprecated math functions were found.
-    """
-    deprecated_files = []
-    # Match function names only when followed by '('
-    function_pattern = re.compile(r"\b(" + "|".join(deprecated_functions) + r")\s*\(")
-
-    for path in Path(root_dir).rglob("*"):
-        if path.suffix in extensions and path.is_file():
-            content = utils.read_file(path)
-            if function_pattern.search(content):  # Only matches function calls
-                deprecated_files.append(str(path))
-
-    return deprecated_files
-
-
-def check_deprecated_functions(
-    logical_path,
-    log,
-    verbose=False,
-    deprecated_string_functions=None,
-    deprecated_math_functions=None,
+def report_deprecated_functions(
+    log, verbose=False, deprecated_string_files=None, deprecated_math_files=None
 ):
-    # Store the list of files containing deprecated string functions
-    deprecated_string_files = check_deprecated_string_functions(
-        logical_path,
-        [".st"],
-        deprecated_string_functions,
-    )
-
-    # Ensure we have a valid list, even if no deprecated functions are found
-    if not isinstance(deprecated_string_files, list):
-        deprecated_string_files = []  # Fallback to an empty list
-
+    """
+    Logs the files using deprecated AsString and AsMath functions.
+    """
     # Boolean flag to indicate whether deprecated string functions were found
     found_deprecated_string = bool(deprecated_string_files)
 
-    # Store the list of files containing deprecated math functions
-    deprecated_math_files = check_deprecated_math_functions(
-        logical_path,
-        [".st"],
-        deprecated_math_functions,
-    )
-
-    # Ensure we have a valid list, even if no deprecated functions are found
-    if not isinstance(deprecated_math_files, list):
-        deprecated_math_files = []  # Fallback to an empty list
-
     # Boolean flag to indicate whether deprecated math functions were found
     found_deprecated_math = bool(deprecated_math_files)
 
@@ -98,8 +43,7 @@ def check_deprecated_functions(
                 "Deprecated AsString functions detected in the following files:",
                 severity="INFO",
             )
-            for f in deprecated_string_files:
-                log(f"- {f}")
+            log("\n".join(f"- {f}" for f in deprecated_string_files))
 
     if found_deprecated_math:
         log(
@@ -115,8 +59,7 @@ def check_deprecated_functions(
                 "Deprecated AsMath functions detected in the following files:",
                 severity="INFO",
             )
-            for f in deprecated_math_files:
-                log(f"- {f}")
+            log("\n".join(f"- {f}" for f in deprecated_math_files))
 
 
 def check_obsolete_functions(
@@ -130,16 +73,24 @@ def check_obsolete_functions(
             "The following invalid function blocks were found in .var and .typ files:",
             severity="WARNING",
         )
-        for block, reason, file_path in invalid_var_typ_files:
-            log(f"- {block}: {reason} (Found in: {file_path})")
+        log(
+            "\n".join(
+                f"- {block}: {reason} (Found in: {file_path})"
+                for block, reason, file_path in invalid_var_typ_files
+            )
+        )
 
     if invalid_st_c_files:
         log(
             "The following invalid functions were found in .st, .c and .cpp files:",
             severity="WARNING",
         )
-        for function, reason, file_path in invalid_st_c_files:
-            log(f"- {function}: {reason} (Found in: {file_path})")
+        log(
+            "\n".join(
+                f"- {function}: {reason} (Found in: {file_path})"
+                for function, reason, file_path in invalid_st_c_files
+            )
+        )
 
     if verbose:
         if not any([invalid_var_typ_files, invalid_st_c_files]):
@@ -155,77 +106,121 @@ def process_var_file(file_path, patterns):
 
     Args:
         file_path (str): Path to the .var file.
-        patterns (dict): Patterns to match with reasons.
+        patterns (dict): Lowercase function block names mapped to (function_block, reason).
 
     Returns:
         list: Matches found in the file.
     """
     results = []
-    content = utils.read_file(Path(file_path))
+    content = utils.read_file(file_path)
 
     # Regex for function block declarations, e.g., : MpAlarmXConfigMapping;
-    matches = re.findall(r":\s*([A-Za-z0-9_]+)\s*;", content)
+    matches = DECLARATION_TYPE_PATTERN.findall(content)
     for match in matches:
-        for pattern, reason in patterns.items():
-            if match.lower() == pattern.lower():
-                results.append((pattern, reason, file_path))
+        hit = patterns.get(match.lower())
+        if hit:
+            results.append((*hit, file_path))
     return results
 
 
-def process_st_c_file(file_path, patterns):
+def find_obsolete_functions(content, file_path, patterns):
     """
-    Processes a .st, .c, or .cpp file to find matches for the given patterns.
+    Finds the given patterns in the content of a .st, .c, or .cpp file.
 
     Args:
+        content (str): Content of the file.
         file_path (str): Path to the file.
-        patterns (dict): Patterns to match with reasons.
+        patterns (dict): Lowercase function names mapped to (function, reason).
 
     Returns:
-        list: Matches found in the file.
+        list: Matches found in the content.
     """
     results = []
-    content = utils.read_file(Path(file_path))
 
-    pattern_map = {p.lower(): (p, reason) for p, reason in patterns.items()}
-    matches = re.findall(r"\b([A-Za-z0-9_]+)\b", content)
+    matches = IDENTIFIER_PATTERN.findall(content)
     for match in matches:
-        key = match.lower()
-        if key in pattern_map:
-            results.append((pattern_map[key][0], pattern_map[key][1], file_path))
+        hit = patterns.get(match.lower())
+        if hit:
+            results.append((*hit, file_path))
     return results
 
 
+def process_source_file(
+    file_path, obsolete_functions, string_functions, math_functions
+):
+    """
+    Reads a .st, .c or .cpp file once and checks it for obsolete functions and,
+    for .st files, deprecated AsString and AsMath functions.
+
+    Args:
+        file_path (str): Path to the file.
+        obsolete_functions (dict): Lowercase obsolete function names mapped to (function, reason).
+        string_functions (tuple): Deprecated AsString functions.
+        math_functions (tuple): Deprecated AsMath functions.
+
+    Returns:
+        list: A single (file_path, obsolete_functions, uses_string_functions, uses_math_functions) tuple.
+    """
+    content = utils.read_file(file_path)
+    obsolete = find_obsolete_functions(content, file_path, obsolete_functions)
+
+    uses_string = uses_math = False
+    if file_path.lower().endswith(".st"):
+        uses_string = bool(string_functions) and bool(
+            _function_pattern(string_functions).search(content)
+        )
+        # Math functions only count when they are called
+        uses_math = bool(math_functions) and bool(
+            _function_pattern(math_functions, r"\s*\(").search(content)
+        )
+    return [(file_path, obsolete, uses_string, uses_math)]
+
+
 def check_functions(logical_path, log, verbose=False):
     log("─" * 80 + "\nChecking for obsolete and deprecated FUBs and functions...")
 
-    obsolete_function_blocks = utils.load_discontinuation_info("obsolete_fbks")
+    obsolete_function_blocks = utils.case_insensitive_lookup(
+        utils.load_discontinuation_info("obsolete_fbks")
+    )
     invalid_var_typ_files = utils.scan_files_parallel(
         logical_path,
         [".var", ".typ"],
         process_var_file,
         obsolete_function_blocks,
+        use_processes=True,
+        cache_version=1,
     )
 
-    obsolete_functions = utils.load_discontinuation_info("obsolete_funcs")
-    invalid_st_c_files = utils.scan_files_parallel(
-        logical_path,
-        [".st", ".c", ".cpp"],
-        process_st_c_file,
-        obsolete_functions,
+    # Case-folded once per run instead of once per file
+    obsolete_functions = utils.case_insensitive_lookup(
+        utils.load_discontinuation_info("obsolete_funcs")
     )
-
-    check_obsolete_functions(log, verbose, invalid_var_typ_files, invalid_st_c_files)
-
     deprecated_string_functions = utils.load_discontinuation_info(
         "deprecated_string_functions"
     )
     deprecated_math_functions = utils.load_discontinuation_info(
         "deprecated_math_functions"
     )
-    check_deprecated_functions(
+    # One pass over the source files feeds the obsolete and deprecated function checks
+    source_results = utils.scan_files_parallel(
         logical_path,
+        [".st", ".c", ".cpp"],
+        process_source_file,
+        obsolete_functions,
+        tuple(deprecated_string_functions),
+        tuple(deprecated_math_functions),
+        use_processes=True,
+        cache_version=1,
+    )
+    invalid_st_c_files = [
+        match for _, obsolete, _, _ in source_results for match in obsolete
+    ]
+
+    check_obsolete_functions(log, verbose, invalid_var_typ_files, invalid_st_c_files)
+
+    report_deprecated_functions(
         log,
         verbose,
-        deprecated_string_functions,
-        deprecated_math_functions,
+        [path for path, _, uses_string, _ in source_results if uses_string],
+        [path for path, _, _, uses_math in source_results if uses_math],
     )
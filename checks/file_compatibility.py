@@ -1,3 +1,4 @@
+import os
 import re
 
 from lxml import etree
@@ -6,7 +7,26 @@ from pathlib import Path
 from utils import utils
 
 
-version_pattern = re.compile(r'AutomationStudio (?:Working)?Version="?([\d.]+)')
+version_pattern = re.compile(rb'AutomationStudio (?:Working)?Version="?([\d.]+)')
+
+
+def read_file_version(file_path):
+    """
+    Returns the AutomationStudio version from the header of a file, or None if there is none
+    """
+    # The version is part of the XML header, only search the whole file if it is not there
+    try:
+        with open(file_path, "rb") as f:
+            version_match = version_pattern.search(f.read(4096))
+    except OSError:
+        version_match = None
+    if version_match:
+        return version_match.group(1).decode("ascii")
+    with utils.map_file(file_path) as content:
+        version_match = version_pattern.search(content)
+        if version_match:
+            return version_match.group(1).decode("ascii")
+    return None
 
 
 def check_file_version(file_path):
@@ -16,10 +36,8 @@ def check_file_version(file_path):
     required_version_prefix = "4.12"
 
     result = set()
-    content = utils.read_file(Path(file_path))
-    version_match = version_pattern.search(content)
-    if version_match:
-        version = version_match.group(1)
+    version = read_file_version(file_path)
+    if version is not None:
         if not version.startswith(required_version_prefix):
             result.add((file_path, version))
     else:
@@ -27,6 +45,25 @@ def check_file_version(file_path):
     return list(result)
 
 
+def check_file_references(file_path):
+    """
+    Checks if a .pkg file contains an element with Type="File" and Reference="true"
+    """
+    # Ignore files in any directory named 'mappView'
+    if "mappView" in file_path.split(os.sep):
+        return []
+    try:
+        # Stream the file and stop at the first matching element
+        for _, element in etree.iterparse(file_path, events=("end",)):
+            if element.get("Type") == "File" and element.get("Reference") == "true":
+                return [file_path]
+            element.clear()
+    except Exception:
+        # Fallback: ignore file if not valid XML
+        pass
+    return []
+
+
 def check_files_for_compatibility(project_path, log, verbose=False):
     """
     Checks the compatibility of .apj and .hw files within a apj_path.
@@ -38,8 +75,14 @@ def check_files_for_compatibility(project_path, log, verbose=False):
     project_path = Path(project_path)
     physical_path = project_path / "Physical"
 
-    results = utils.scan_files_parallel(project_path, [".apj"], check_file_version)
-    results += utils.scan_files_parallel(physical_path, [".hw"], check_file_version)
+    # The project file is always located in the project root, there is no need to walk
+    # the whole project (including Temp and Binaries) to find it
+    results = []
+    for apj_file in project_path.glob("*.apj"):
+        results += check_file_version(str(apj_file))
+    results += utils.scan_files_parallel(
+        physical_path, [".hw"], check_file_version, cache_version=1
+    )
     if results:
         log(
             "The following files are incompatible with the required version:",
@@ -58,22 +101,9 @@ def check_files_for_compatibility(project_path, log, verbose=False):
             log("All project and hardware files are valid.", severity="VERBOSE")
 
     # --- Search for *.pkg files in config_folder and subfolders ---
-    reference_files = []
-    for path in physical_path.rglob("*.pkg"):
-        # Ignore files in any directory named 'mappView'
-        if "mappView" in path.parts:
-            continue
-        if path.is_file():
-            try:
-                tree = etree.parse(str(path))
-                root = tree.getroot()
-                # Suche mit XPath nach allen Elementen mit Type="File" und Reference="true"
-                matches = root.xpath('.//*[@Type="File" and @Reference="true"]')
-                if matches:
-                    reference_files.append(str(path))
-            except Exception as e:
-                # Fallback: ignore file if not valid XML
-                pass
+    reference_files = utils.scan_files_parallel(
+        physical_path, [".pkg"], check_file_references, cache_version=1
+    )
 
     if reference_files:
         log(
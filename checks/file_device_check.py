@@ -1,86 +1,100 @@
-import os
 import re
-from pathlib import Path
+from collections import defaultdict
 
 from utils import utils
 
-
-def process_file_devices(file_path):
+# Name and path of a file device defined in a .hw file.
+# Possessive quantifiers and [^"] values keep near misses from backtracking.
+FILE_DEVICE_PATTERN = re.compile(
+    rb'<Group ID="FileDevice\d++" />\s*+<Parameter ID="FileDeviceName\d++" Value="([^"]*+)" />\s*+<Parameter ID="FileDevicePath\d++" Value="([^"]*+)" />'
+)
+# Activation state of the FTP server
+FTP_ACTIVE_PATTERN = re.compile(
+    rb'<Parameter ID="ActivateFtpServer"\s++Value="(\d)" />'
+)
+# Partitions accessible via FTP
+FTP_PARTITION_PATTERN = re.compile(
+    rb'<Parameter ID="FTPMSPartition\d++"\s++Value="([^"]*+)" />'
+)
+
+
+def find_file_devices(content, file_path):
     """
     Args:
+        content: Content of the .hw file.
         file_path: Path to the .hw file.
 
     Returns:
-        list: Unique matches found in the file.
+        list: Unique matches found in the content.
     """
+    # Cheap literal test first, most .hw files define no file devices
+    if content.find(b"FileDevice") == -1:
+        return []
+
     exclude = ["C:\\", "D:\\", "E:\\", "F:\\"]
     results = set()  # Use a set to store unique matches
-    content = utils.read_file(Path(file_path))
 
     # Regex to extract the value from the file device elements
-    matches = re.findall(
-        r'<Group ID="FileDevice\d+" />\s*<Parameter ID="FileDeviceName\d+" Value="(.*?)" />\s*<Parameter ID="FileDevicePath\d+" Value="(.*?)" />',
-        content,
-    )
+    matches = FILE_DEVICE_PATTERN.findall(content)
     for name, path in matches:
+        name = name.decode("utf-8", "ignore")
+        path = path.decode("utf-8", "ignore")
         for exclusion in exclude:
             if path.lower().startswith(exclusion.lower()):
                 results.add((name, path, file_path))
     return list(results)  # Convert back to a list for consistency
 
 
-def process_ftp_configurations(file_path):
+def find_ftp_configurations(content, file_path):
     """
     Args:
+        content: Content of the .hw file.
         file_path: Path to the .hw file.
 
     Returns:
-        list: Unique matches found in the file.
+        list: Unique matches found in the content.
     """
+    # Cheap literal test first, without partitions there is nothing to report
+    if content.find(b"FTPMSPartition") == -1:
+        return []
+
     results = set()
-    content = utils.read_file(Path(file_path))
 
     # Regex to extract if the FTP server is activated
-    matches = re.search(r'<Parameter ID="ActivateFtpServer"\s+Value="(\d)" />', content)
-    if not matches or matches.group(0) == "1":
-        matches = re.findall(
-            r'<Parameter ID="FTPMSPartition\d+"\s+Value="(.*?)" />', content
-        )
+    matches = FTP_ACTIVE_PATTERN.search(content)
+    if not matches or matches.group(1) == b"1":
+        matches = FTP_PARTITION_PATTERN.findall(content)
         if matches:
             for match in matches:
-                if "SYSTEM" == match:
-                    results.add((match, file_path))
+                if b"SYSTEM" == match:
+                    results.add((match.decode(), file_path))
     return list(results)  # Convert back to a list for consistency
 
 
-def check_file_devices(physical_path, log, verbose=False):
+def report_file_devices(file_devices, ftp_configs, log, verbose=False):
+    """
+    Logs the file devices and ftp configurations found in the .hw files.
+    """
     log("─" * 80 + "\nChecking for invalid file devices and ftp configurations...")
 
-    results = utils.scan_files_parallel(
-        physical_path, [".hw"], [process_file_devices, process_ftp_configurations]
-    )
-    file_devices = results["process_file_devices"]
-    ftp_configs = results["process_ftp_configurations"]
-
     if file_devices:
         log(
             "The following invalid file devices were found: (accessing system partitions / using drive letters)",
             when="AS6",
             severity="MANDATORY",
         )
-        grouped_results = {}
+        grouped_results = defaultdict(set)
         for name, path, file_path in file_devices:
-            config_name = os.path.basename(os.path.dirname(file_path))
-            grouped_results.setdefault(config_name, set()).add((name, path))
+            config_name = utils.parent_folder_name(file_path)
+            grouped_results[config_name].add((name, path))
 
-        output = ""
-        for config_name, entries in grouped_results.items():
-            results = []
-            for name, path in sorted(entries):
-                results.append(f"{name} ({path})")
-            result_string = ", ".join(results)
-            output += f"\n - Hardware configuration '{config_name}': {result_string}"
-        log(output[1:])
+        log(
+            "\n".join(
+                f" - Hardware configuration '{config_name}': "
+                + ", ".join(f"{name} ({path})" for name, path in sorted(entries))
+                for config_name, entries in grouped_results.items()
+            )
+        )
 
         log(
             "Write operations on a system partition (C:, D:, E:) are not allowed on real targets."
@@ -100,10 +114,10 @@ def check_file_devices(physical_path, log, verbose=False):
             when="AS6",
             severity="WARNING",
         )
-        grouped_results = {}
+        grouped_results = defaultdict(set)
         for name, file_path in ftp_configs:
-            config_name = os.path.basename(os.path.dirname(file_path))
-            grouped_results.setdefault(config_name, set()).add(name)
+            config_name = utils.parent_folder_name(file_path)
+            grouped_results[config_name].add(name)
 
         for config_name, entries in grouped_results.items():
             log(f"Hardware configuration: {config_name}")
@@ -1,45 +1,86 @@
-import os
 import re
+from collections import defaultdict
 from pathlib import Path
 
+from checks import file_device_check
 from utils import utils
 
+# Type of a hardware module, e.g. <Module Name="X20CP1586" Type="X20CP1586" ...>
+MODULE_TYPE_PATTERN = re.compile(rb'<Module [^>]*Type="([^"]+)"')
 
-def process_hw_file(file_path, hardware_dict):
+
+def reasons_by_hardware_type(hardware_dict):
+    """
+    Inverts the unsupported hardware dictionary (reason -> types) to type -> reasons.
+    """
+    result = {}
+    for reason, items in hardware_dict.items():
+        for hw_type in items:
+            result.setdefault(hw_type, []).append(reason)
+    return result
+
+
+def find_unsupported_hardware(content, file_path, hardware_dict):
     """
-    Processes a .hw file to find unsupported hardware matches.
+    Finds unsupported hardware in the content of a .hw file.
 
     Args:
+        content (bytes): Content of the .hw file.
         file_path (str): Path to the .hw file.
-        hardware_dict (dict): Dictionary of unsupported hardware and their reasons.
+        hardware_dict (dict): Unsupported hardware types mapped to their reasons.
 
     Returns:
-        list: Unique matches found in the file.
+        list: Unique matches found in the content.
     """
     results = set()  # Use a set to store unique matches
-    content = utils.read_file(Path(file_path))
 
     # Regex to extract the Type value from the <Module> elements
-    matches = re.findall(r'<Module [^>]*Type="([^"]+)"', content)
+    matches = MODULE_TYPE_PATTERN.findall(content)
     for hw_type in matches:
-        for reason, items in hardware_dict.items():
-            if hw_type in items:
-                results.add(
-                    (hw_type, reason, file_path)
-                )  # Add as a tuple to ensure uniqueness
+        hw_type = hw_type.decode("utf-8", "ignore")
+        for reason in hardware_dict.get(hw_type, ()):
+            results.add(
+                (hw_type, reason, file_path)
+            )  # Add as a tuple to ensure uniqueness
     return list(results)  # Convert back to a list for consistency
 
 
+def process_hw_file_all(file_path, hardware_dict):
+    """
+    Reads a .hw file once and runs the hardware, file device and ftp checks on it.
+
+    Args:
+        file_path (str): Path to the .hw file.
+        hardware_dict (dict): Unsupported hardware types mapped to their reasons.
+
+    Returns:
+        list: A single (hardware, file_devices, ftp_configs) tuple of matches.
+    """
+    with utils.map_file(file_path) as content:
+        return [
+            (
+                find_unsupported_hardware(content, file_path, hardware_dict),
+                file_device_check.find_file_devices(content, file_path),
+                file_device_check.find_ftp_configurations(content, file_path),
+            )
+        ]
+
+
 def check_hardware(physical_path, log, verbose=False):
+    """
+    Checks the .hw files for unsupported hardware, invalid file devices and ftp configurations.
+    """
     log("─" * 80 + "\nChecking for invalid hardware...")
 
     unsupported_hardware = utils.load_discontinuation_info("unsupported_hw")
-    hardware_results = utils.scan_files_parallel(
+    per_file_results = utils.scan_files_parallel(
         physical_path,
         [".hw"],
-        process_hw_file,
-        unsupported_hardware,
+        process_hw_file_all,
+        reasons_by_hardware_type(unsupported_hardware),
+        cache_version=1,
     )
+    hardware_results = [hw for result in per_file_results for hw in result[0]]
 
     if hardware_results:
         log(
@@ -47,27 +88,39 @@ def check_hardware(physical_path, log, verbose=False):
             when="AS4",
             severity="WARNING",
         )
-        grouped_results = {}
+        grouped_results = defaultdict(set)
         for hardware_id, reason, file_path in hardware_results:
-            config_name = os.path.basename(os.path.dirname(file_path))
-            grouped_results.setdefault(config_name, set()).add((hardware_id, reason))
+            config_name = utils.parent_folder_name(file_path)
+            grouped_results[config_name].add((hardware_id, reason))
 
         for config_name, entries in grouped_results.items():
-            log(f"\nHardware configuration: {config_name}")
-            for hardware_id, reason in sorted(entries):
-                log(f"- {hardware_id}: {reason}")
+            log(
+                f"\nHardware configuration: {config_name}\n"
+                + "\n".join(
+                    f"- {hardware_id}: {reason}"
+                    for hardware_id, reason in sorted(entries)
+                )
+            )
     else:
         if verbose:
             log("No unsupported hardware found in the project.", severity="INFO")
 
+    # The file device check shares the scan above instead of reading every .hw file again
+    file_device_check.report_file_devices(
+        [device for result in per_file_results for device in result[1]],
+        [config for result in per_file_results for config in result[2]],
+        log,
+        verbose,
+    )
+
 
 def count_hardware(folder: Path):
     result = {}
     for file_path in folder.rglob("*.hw"):
-        content = utils.read_file(file_path)
-        matches = re.findall(r'<Module [^>]*Type="([^"]+)"', content)
+        with utils.map_file(file_path) as content:
+            matches = MODULE_TYPE_PATTERN.findall(content)
         for match in matches:
-            module = match
+            module = match.decode("utf-8", "ignore")
             result.setdefault(module, {"cnt": 0})
             result[module]["cnt"] += 1
     return result
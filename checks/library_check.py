@@ -1,62 +1,80 @@
+import itertools
 import os
 import re
 from pathlib import Path
 
 from utils import utils
 
+# Object names listed in a .pkg file, e.g. <Object Type="Library">AsArLog</Object>
+PKG_OBJECT_PATTERN = re.compile(rb">([^<]+)<", re.IGNORECASE)
+# Dependencies of a library in a .lby file
+DEPENDENCY_PATTERN = re.compile(rb'<Dependency ObjectName="([^"]+)"', re.IGNORECASE)
+# Header included by a C/C++ file
+INCLUDE_PATTERN = re.compile(rb'#include\s+[<"]([^">]+)[">]')
 
-def process_pkg_file(file_path, patterns):
+
+def read_pkg_objects(file_path):
+    """
+    Returns the lowercase object names listed in a .pkg file, ready for the case-folded lookups.
+    """
+    with utils.map_file(file_path) as content:
+        # Regex for library names between > and <
+        matches = PKG_OBJECT_PATTERN.findall(content)
+    return [match.decode("utf-8", "ignore").lower() for match in matches]
+
+
+def find_obsolete_libraries(matches, file_path, patterns):
     """
-    Processes a .pkg file to find matches for obsolete libraries.
+    Matches the object names of a .pkg file against obsolete libraries.
 
     Args:
+        matches (list): Lowercase object names found in the .pkg file.
         file_path (str): Path to the .pkg file.
-        patterns (dict): Patterns to match with reasons.
+        patterns (dict): Lowercase library names mapped to (library, reason).
 
     Returns:
-        list: Matches found in the file.
+        list: Matches found in the file. Only names are compared, the caller checks with
+        is_library_folder() that a match really is a library, so the result depends on the
+        .pkg file alone and can be cached.
     """
     results = []
-    content = utils.read_file(Path(file_path))
-
-    # Regex for library names between > and <
-    matches = re.findall(r">([^<]+)<", content, re.IGNORECASE)
     for match in matches:
-        for pattern, reason in patterns.items():
-            if match.lower() == pattern.lower():
-                # if we find a match, check if we can find a matching *.lby file in the subdir
-                pkg_path = Path(file_path).parent / pattern
-                is_lib = any(pkg_path.rglob("*.lby"))
-                if is_lib:
-                    results.append((pattern, reason, file_path))
+        hit = patterns.get(match)
+        if hit:
+            results.append((*hit, file_path))
     return results
 
 
+def is_library_folder(file_path, library):
+    """
+    Checks if the folder of a library listed in a .pkg file contains a *.lby file.
+    """
+    return any((Path(file_path).parent / library).rglob("*.lby"))
+
+
 def process_lby_file(file_path, patterns):
     """
     Processes a .lby file to find obsolete dependencies.
 
     Args:
         file_path (str): Path to the .lby file.
-        patterns (dict): Patterns of obsolete dependencies with reasons.
+        patterns (dict): Lowercase dependency names mapped to (library, reason).
 
     Returns:
         list: Matches found in the file in the format (library_name, dependency, reason, file_path).
     """
     results = []
-    content = utils.read_file(Path(file_path))
 
     # Extract library name (directory name as identifier)
     library_name = os.path.basename(os.path.dirname(file_path))
-    # Extract dependencies from the XML content
-    dependencies = re.findall(
-        r'<Dependency ObjectName="([^"]+)"', content, re.IGNORECASE
-    )
-    for dependency in dependencies:
-        for pattern, reason in patterns.items():
+    # Extract dependencies from the XML content, matches are consumed before the mapping closes
+    with utils.map_file(file_path) as content:
+        for match in DEPENDENCY_PATTERN.finditer(content):
+            dependency = match.group(1).decode("utf-8", "ignore")
             # Compare case-insensitively
-            if dependency.lower() == pattern.lower():
-                results.append((library_name, dependency, reason, file_path))
+            hit = patterns.get(dependency.lower())
+            if hit:
+                results.append((library_name, dependency, hit[1], file_path))
     return results
 
 
@@ -66,80 +84,105 @@ def process_c_cpp_hpp_includes_file(file_path, patterns):
 
     Args:
         file_path (str): Path to the file.
-        patterns (dict): Dictionary of obsolete libraries with reasons.
+        patterns (dict): Lowercase header names (e.g. "asstring.h") mapped to (library, reason).
 
     Returns:
         list: Matches found in the file in the format (library_name, reason, file_path).
     """
     results = []
-    include_pattern = re.compile(r'#include\s+[<"]([^">]+)[">]')
-    content = utils.read_file(Path(file_path))
-
-    for line in content:
-        match = include_pattern.search(line)
-        if match:
-            included_library = match.group(1).lower()  # Normalize case
-            for pattern, reason in patterns.items():
-                if included_library == f"{pattern.lower()}.h":
-                    results.append((pattern, reason, file_path))
+    with utils.map_file(file_path) as content:
+        # Cheap literal test first, skips files without any include
+        if content.find(b"#include") == -1:
+            return []
+        includes = INCLUDE_PATTERN.findall(content)
+
+    for included_library in includes:
+        # Normalize case
+        hit = patterns.get(included_library.decode("utf-8", "ignore").lower())
+        if hit:
+            results.append((*hit, file_path))
     return results
 
 
-# Function to process libraries requiring manual process
-def process_manual_libraries(file_path, patterns):
+def find_manual_libraries(matches, file_path, patterns):
     """
-    Processes .pkg or .lby files to find libraries that require manual action during migration.
+    Matches the object names of a .pkg file against libraries requiring manual action.
 
     Args:
-        file_path (str): Path to the file.
-        patterns (dict): Libraries to be checked for manual process.
+        matches (list): Lowercase object names found in the .pkg file.
+        file_path (str): Path to the .pkg file.
+        patterns (dict): Lowercase library names mapped to (library, action).
 
     Returns:
         list: Matches found in the file.
     """
     results = []
-    content = utils.read_file(Path(file_path))
-
-    matches = re.findall(r">([^<]+)<", content, re.IGNORECASE)
     for match in matches:
-        for library, action in patterns.items():
-            if match.lower() == library.lower():
-                results.append((library, action, file_path))
+        hit = patterns.get(match)
+        if hit:
+            results.append((*hit, file_path))
     return results
 
 
+def process_library_file(
+    file_path, obsolete_patterns, manual_patterns, header_patterns
+):
+    """
+    Checks a .pkg, .lby, .c, .cpp or .hpp file according to its type, so all of them are scanned in one pass.
+
+    Args:
+        file_path (str): Path to the file.
+        obsolete_patterns (dict): Lowercase library names mapped to (library, reason).
+        manual_patterns (dict): Lowercase library names mapped to (library, action).
+        header_patterns (dict): Lowercase header names mapped to (library, reason).
+
+    Returns:
+        list: A single (obsolete_libraries, manual_libraries, lby_dependencies, include_dependencies)
+        tuple of matches, only the entries for the file type are filled.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".pkg":
+        matches = read_pkg_objects(file_path)
+        return [
+            (
+                find_obsolete_libraries(matches, file_path, obsolete_patterns),
+                find_manual_libraries(matches, file_path, manual_patterns),
+                [],
+                [],
+            )
+        ]
+    if extension == ".lby":
+        return [([], [], process_lby_file(file_path, obsolete_patterns), [])]
+    return [([], [], [], process_c_cpp_hpp_includes_file(file_path, header_patterns))]
+
+
 def check_libraries(logical_path, log, verbose=False):
     log("─" * 80 + "\nChecking for invalid libraries and dependencies...")
 
     manual_process_libraries = utils.load_discontinuation_info("manual_process_libs")
-    manual_libs_results = utils.scan_files_parallel(
-        logical_path,
-        [".pkg"],
-        process_manual_libraries,
-        manual_process_libraries,
-    )
-
     obsolete_dict = utils.load_discontinuation_info("obsolete_libs")
-    invalid_pkg_files = utils.scan_files_parallel(
-        logical_path,
-        [".pkg"],
-        process_pkg_file,
-        obsolete_dict,
-    )
 
-    lby_dependency_results = utils.scan_files_parallel(
+    # One scan for all file types, the results stay grouped by extension in this order
+    results = utils.scan_files_parallel(
         logical_path,
-        [".lby"],
-        process_lby_file,
-        obsolete_dict,
-    )
-
-    c_include_dependency_results = utils.scan_files_parallel(
-        logical_path,
-        [".c", ".cpp", ".hpp"],
-        process_c_cpp_hpp_includes_file,
-        obsolete_dict,
+        [".pkg", ".lby", ".c", ".cpp", ".hpp"],
+        process_library_file,
+        utils.case_insensitive_lookup(obsolete_dict),
+        utils.case_insensitive_lookup(manual_process_libraries),
+        utils.case_insensitive_lookup(obsolete_dict, suffix=".h"),
+        use_processes=True,
+        cache_version=1,
     )
+    # Objects named like an obsolete library only count if their folder holds a library
+    invalid_pkg_files = [
+        (library, reason, file_path)
+        for result in results
+        for library, reason, file_path in result[0]
+        if is_library_folder(file_path, library)
+    ]
+    manual_libs_results = [lib for result in results for lib in result[1]]
+    lby_dependency_results = [dep for result in results for dep in result[2]]
+    c_include_dependency_results = [dep for result in results for dep in result[3]]
 
     if invalid_pkg_files:
         log(
@@ -147,8 +190,12 @@ def check_libraries(logical_path, log, verbose=False):
             when="AS6",
             severity="MANDATORY",
         )
-        for library, reason, file_path in invalid_pkg_files:
-            log(f"- {library}: {reason} (Found in: {file_path})")
+        log(
+            "\n".join(
+                f"- {library}: {reason} (Found in: {file_path})"
+                for library, reason, file_path in invalid_pkg_files
+            )
+        )
     else:
         if verbose:
             log("No invalid libraries found in .pkg files.", severity="INFO")
@@ -159,8 +206,12 @@ def check_libraries(logical_path, log, verbose=False):
             when="AS6",
             severity="WARNING",
         )
-        for library, reason, file_path in manual_libs_results:
-            log(f"- {library}: {reason} (Found in: {file_path})")
+        log(
+            "\n".join(
+                f"- {library}: {reason} (Found in: {file_path})"
+                for library, reason, file_path in manual_libs_results
+            )
+        )
     else:
         if verbose:
             log(
@@ -168,23 +219,27 @@ def check_libraries(logical_path, log, verbose=False):
                 severity="INFO",
             )
 
-    # Convert .lby results to match the (library_name, reason, file_path) format
-    normalized_lby_results = [
-        (lib, f"Dependency on {dep}: {reason}", path)
-        for lib, dep, reason, path in lby_dependency_results
-    ]
-
-    # Merge results from .lby and C/C++/HPP include dependencies
-    all_dependency_results = normalized_lby_results + c_include_dependency_results
-
-    if all_dependency_results:
+    if lby_dependency_results or c_include_dependency_results:
         log(
             "The following obsolete dependencies were found in .lby, .c, .cpp, and .hpp files:",
             when="AS6",
             severity="MANDATORY",
         )
-        for library_name, reason, file_path in all_dependency_results:
-            log(f"- {library_name}: {reason} (Found in: {file_path})")
+        # Convert .lby results to the (library_name, reason, file_path) format on the fly
+        # and follow them with the C/C++/HPP include dependencies
+        all_dependency_results = itertools.chain(
+            (
+                (lib, f"Dependency on {dep}: {reason}", path)
+                for lib, dep, reason, path in lby_dependency_results
+            ),
+            c_include_dependency_results,
+        )
+        log(
+            "\n".join(
+                f"- {library_name}: {reason} (Found in: {file_path})"
+                for library_name, reason, file_path in all_dependency_results
+            )
+        )
     else:
         if verbose:
             log(
@@ -1,9 +1,95 @@
+import concurrent.futures
+import functools
 from pathlib import Path
 
 from utils import utils
 from checks import hardware_check
 
 
+def read_physical_file(file: Path, motion_functions, vision_functions):
+    """
+    Reads the values mapp_license_analyzer needs from a file of the Physical view.
+    Only reads, the counting is left to the caller so files can be read in parallel.
+    """
+    if file.suffix == ".assembly":
+        return utils.file_value_by_id(file, ["Strategy"])
+    elif file.suffix == ".axis":
+        pairs = [{"type": obj["type"], "cnt": 0} for obj in motion_functions]
+        return utils.file_type_count(file, pairs)
+    elif file.suffix == ".mappconnect":
+        return utils.file_value_by_id(file, ["Url"])
+    elif file.suffix == ".mappviewcfg":
+        return utils.file_value_by_id(file, ["MaxClientConnections"])
+    elif file.suffix == ".uaserver":
+        return utils.file_value_by_id(file, ["IPAddress"])
+    elif file.suffix == ".visionapplication":
+        pairs = [
+            {"id": "VfType", "value": obj["VfType"], "cnt": 0}
+            for obj in vision_functions
+        ]
+        return utils.file_value_count(file, pairs)
+    return None
+
+
+def _count_assembly(result, items):
+    for item in items:
+        result["mappTrak"]["collisionAvoidance"] = item["value"]
+        if item["value"] == "Variable" or item["value"] == "AdvancedVariable":
+            break
+
+
+def _count_axis(result, items):
+    for obj in result["mappMotion"]["functions"]:
+        for item in items:
+            if obj["type"] == item["type"]:
+                obj["cnt"] = item["cnt"]
+
+
+def _count_eventscript(result, items):
+    result["mappView"]["eventScriptCnt"] += 1
+
+
+def _count_mappconnect(result, items):
+    result["mappConnect"] = {"opcUaServerCnt": 0}
+    for item in items:
+        if "Url" in item["name"]:
+            result["mappConnect"]["opcUaServerCnt"] += 1
+
+
+def _count_mappviewcfg(result, items):
+    for item in items:
+        if "MaxClientConnections" in item["name"]:
+            result["mappView"]["clientCnt"] = int(item["value"])
+
+
+def _count_uaserver(result, items):
+    for item in items:
+        if "IPAddress" in item["name"]:
+            result["mappView"]["uaServerCnt"] += 1
+
+
+def _count_visionapplication(result, items):
+    result["mappVision"] = {
+        "functions": utils.load_file_info("licenses", "mapp_vision")
+    }
+    for obj in result["mappVision"]["functions"]:
+        for item in items:
+            if obj["VfType"] == item["value"]:
+                obj["cnt"] = item["cnt"]
+
+
+# Physical files whose content or presence counts towards a mapp license, mapped to their counting step
+COUNT_HANDLERS = {
+    ".assembly": _count_assembly,
+    ".axis": _count_axis,
+    ".eventscript": _count_eventscript,
+    ".mappconnect": _count_mappconnect,
+    ".mappviewcfg": _count_mappviewcfg,
+    ".uaserver": _count_uaserver,
+    ".visionapplication": _count_visionapplication,
+}
+
+
 def mapp_license_analyzer(project_path: Path):
     result = {}
     logical = project_path / "Logical"
@@ -23,13 +109,27 @@ def mapp_license_analyzer(project_path: Path):
             "clientCnt": 0,
             "eventScriptCnt": 0,
         }
+        # Build the widget type names once instead of once per line and widget
+        needles = [
+            ("widgets.brease." + obj["name"], obj)
+            for obj in result["mappView"]["breaseWidgets"]
+        ]
         for file in mapp_view_path.rglob("*"):
             if file.is_file() and ".content" in file.name:
-                lines = utils.read_file(file).splitlines()
-                for line in lines:
-                    for obj in result["mappView"]["breaseWidgets"]:
-                        if "widgets.brease." + obj["name"] in line:
+                content = utils.read_file(file)
+                # Jump from one brease widget reference to the next instead of splitting
+                # all lines, each widget still counts once per line
+                pos = content.find("widgets.brease.")
+                while pos != -1:
+                    start = content.rfind("\n", 0, pos) + 1
+                    end = content.find("\n", pos)
+                    if end == -1:
+                        end = len(content)
+                    line = content[start:end]
+                    for needle, obj in needles:
+                        if needle in line:
                             obj["cnt"] += 1
+                    pos = content.find("widgets.brease.", end)
                 break
 
     services = utils.load_file_info("licenses", "mapp_services")
@@ -40,68 +140,33 @@ def mapp_license_analyzer(project_path: Path):
     result["mappTrak"] = {"hardware": [], "collisionAvoidance": ""}
     result["mappConnect"] = None
     result["mappVision"] = None
-    for file in physical.rglob("*"):
-        if not file.is_file():
-            continue
-
-        if file.suffix == ".assembly":
-            items = utils.file_value_by_id(file, ["Strategy"])
-            if len(items) > 0:
-                for item in items:
-                    result["mappTrak"]["collisionAvoidance"] = item["value"]
-                    if (
-                        item["value"] == "Variable"
-                        or item["value"] == "AdvancedVariable"
-                    ):
-                        break
-
-        elif file.suffix == ".axis":
-            pairs = []
-            for obj in result["mappMotion"]["functions"]:
-                pairs.append({"type": obj["type"], "cnt": 0})
-            items = utils.file_type_count(file, pairs)
-            for obj in result["mappMotion"]["functions"]:
-                for item in items:
-                    if obj["type"] == item["type"]:
-                        obj["cnt"] = item["cnt"]
-
-        elif file.suffix == ".eventscript":
-            result["mappView"]["eventScriptCnt"] += 1
-        elif file.suffix == ".mappconnect":
-            result["mappConnect"] = {"opcUaServerCnt": 0}
-            items = utils.file_value_by_id(file, ["Url"])
-            for item in items:
-                if "Url" in item["name"]:
-                    result["mappConnect"]["opcUaServerCnt"] += 1
-        elif file.suffix == ".mappviewcfg":
-            items = utils.file_value_by_id(file, ["MaxClientConnections"])
-            for item in items:
-                if "MaxClientConnections" in item["name"]:
-                    result["mappView"]["clientCnt"] = int(item["value"])
-        elif file.suffix == ".uaserver":
-            items = utils.file_value_by_id(file, ["IPAddress"])
-            for item in items:
-                if "IPAddress" in item["name"]:
-                    result["mappView"]["uaServerCnt"] += 1
-
-        elif file.suffix == ".visionapplication":
-            result["mappVision"] = {
-                "functions": utils.load_file_info("licenses", "mapp_vision")
-            }
-            pairs = []
-            for obj in result["mappVision"]["functions"]:
-                pairs.append({"id": "VfType", "value": obj["VfType"], "cnt": 0})
-            items = utils.file_value_count(file, pairs)
-            for obj in result["mappVision"]["functions"]:
-                for item in items:
-                    if obj["VfType"] == item["value"]:
-                        obj["cnt"] = item["cnt"]
-
-        for service in services:
-            for serviceFile in service["file"]:
-                if serviceFile in file.name:
-                    service["cnt"] += 1
-        result["mappServices"]["services"] = services
+
+    # Service file extensions mapped to the services they count for
+    service_index = {}
+    for service in services:
+        for name in service["file"]:
+            service_index.setdefault(name.lower(), []).append(service)
+    # Read the files in parallel, then count in path order: for the counts that are set
+    # rather than summed (.axis, .visionapplication, ...), the file sorted last wins
+    files = sorted(
+        map(Path, utils.list_files(physical, [*COUNT_HANDLERS, *service_index]))
+    )
+    read_file = functools.partial(
+        read_physical_file,
+        motion_functions=result["mappMotion"]["functions"],
+        vision_functions=utils.load_file_info("licenses", "mapp_vision"),
+    )
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        file_items = list(executor.map(read_file, files))
+
+    for file, items in zip(files, file_items):
+        count = COUNT_HANDLERS.get(file.suffix)
+        if count is not None:
+            count(result, items)
+
+        for service in service_index.get(file.suffix.lower(), ()):
+            service["cnt"] += 1
+    result["mappServices"]["services"] = services
 
     # count all the hardware in the project
     hardware = hardware_check.count_hardware(physical)
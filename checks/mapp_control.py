@@ -5,6 +5,10 @@ from pathlib import Path
 
 from utils import utils
 
+# Libraries that are now part of mappControl, as listed in a .pkg file
+MAPP_CONTROL_LIBRARIES = ["MTBasics", "MTLinAlg", "MTFilter", "MTLookup", "MTProfile"]
+LIBRARY_PATTERN = re.compile(rf">({'|'.join(MAPP_CONTROL_LIBRARIES)})<")
+
 
 def check_mapp_control(apj_path: Path, log, verbose=False):
     """
@@ -18,10 +22,10 @@ def check_mapp_control(apj_path: Path, log, verbose=False):
     # 1. Check .apj file in root for mappControl
     if apj_path:
         try:
-            tree = etree.parse(str(apj_path))
-            root = tree.getroot()
-            mapp_control = root.find(".//{*}mappControl")
-            if mapp_control is not None:
+            # Stream the file and stop at the first mappControl element
+            for _event, _elem in etree.iterparse(
+                str(apj_path), events=("start",), tag="{*}mappControl"
+            ):
                 if verbose:
                     log("Project uses mappControl, nothing to do", severity="INFO")
                 return
@@ -32,12 +36,12 @@ def check_mapp_control(apj_path: Path, log, verbose=False):
     search_path = project_root / "Logical"
 
     found = set()
-    libs = ["MTBasics", "MTLinAlg", "MTFilter", "MTLookup", "MTProfile"]
     for file in search_path.rglob("*.pkg"):
         content = utils.read_file(file)
-        for lib in libs:
-            if re.search(rf">{lib}<", content):
-                found.add(lib)
+        found.update(LIBRARY_PATTERN.findall(content))
+        # Nothing left to find once every library was seen
+        if len(found) == len(MAPP_CONTROL_LIBRARIES):
+            break
 
     if found:
         output = "The project uses libraries that are now part of mappControl, which was not found in the project:"
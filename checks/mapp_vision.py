@@ -2,6 +2,9 @@ import re
 
 from utils import utils
 
+# mappVision entry in the .apj file with its major and minor version
+VERSION_PATTERN = re.compile(r'<mappVision\s[^>]*?Version="(\d+)\.(\d+)')
+
 
 def check_vision_settings(apj_path, log, verbose=False):
     """
@@ -9,24 +12,21 @@ def check_vision_settings(apj_path, log, verbose=False):
     """
     log("─" * 80 + "\nChecking mappVision version in project file...")
 
-    # Check for mappVision line in the .apj file
-    for line in utils.read_file(apj_path).splitlines():
-        if "<mappVision " in line and "Version=" in line:
-            match = re.search(r'Version="(\d+)\.(\d+)', line)
-            if match:
-                major = int(match.group(1))
-                minor = int(match.group(2))
-                version = f"{major}.{minor}"
+    # Check for mappVision entries in the .apj file in one pass over the text
+    for match in VERSION_PATTERN.finditer(utils.read_file(apj_path)):
+        major = int(match.group(1))
+        minor = int(match.group(2))
+        version = f"{major}.{minor}"
 
-                log(
-                    f"Found usage of mapp Vision (Version: {version})",
-                    severity="INFO",
-                )
-                log(
-                    f"After migrating to AS6 make sure that IP forwarding is activated under the Powerlink interface! (AR/Features_and_changes)",
-                    when="AS6",
-                    severity="MANDATORY",
-                )
+        log(
+            f"Found usage of mapp Vision (Version: {version})",
+            severity="INFO",
+        )
+        log(
+            f"After migrating to AS6 make sure that IP forwarding is activated under the Powerlink interface! (AR/Features_and_changes)",
+            when="AS6",
+            severity="MANDATORY",
+        )
 
     if verbose:
         # Walk through all directories
@@ -4,6 +4,9 @@ from lxml import etree
 
 from utils import utils
 
+# Safety release version of a .pkg file, e.g. SafetyRelease="4.2"
+SAFETY_RELEASE_PATTERN = re.compile(r'SafetyRelease="(\d+)\.(\d+)"')
+
 
 def check_safety_release(apj_path, log, verbose=False):
     """
@@ -31,10 +34,11 @@ def check_safety_release(apj_path, log, verbose=False):
     # 2. Search for *.pkg files in the Physical view containing 'SafetyRelease' with version != 0.0
     search_path = project_root / "Physical"
 
-    for file in search_path.rglob("*.pkg"):
+    # The file lists come from the walk of Physical/ the other checks share
+    for file in utils.list_files(search_path, [".pkg"]):
         content = utils.read_file(file)
         if 'SafetyRelease="' in content:
-            match = re.search(r'SafetyRelease="(\d+)\.(\d+)"', content)
+            match = SAFETY_RELEASE_PATTERN.search(content)
             if match and (match.group(1) != "0" or match.group(2) != "0"):
                 log(
                     "Legacy safety is no longer supported with AS 6.x."
@@ -47,7 +51,7 @@ def check_safety_release(apj_path, log, verbose=False):
                 return True
 
     # 3. Check for *.swt files in Physical folders
-    for swt_path in project_root.rglob("*.swt"):
+    for swt_path in utils.list_files(search_path, [".swt"]):
         log(
             f"Safety .swt file found but no SafetyRelease or MappSafety version found: {swt_path}",
             severity="WARNING",
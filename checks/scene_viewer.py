@@ -4,6 +4,25 @@ from pathlib import Path
 
 from utils import utils
 
+SCENE_VIEWER_PATTERN = re.compile(r"Scene\s*Viewer", re.IGNORECASE)
+# XML-ish: handle ID/Name and any attribute order
+FILE_DEVICE_VALUE_PATTERN = re.compile(
+    r'(?:ID|Name)\s*=\s*"(?:File\s*Device|FileDeviceName\d+)"[^>]*\bValue\s*=\s*"([^"]*)"',
+    re.IGNORECASE,
+)
+# Key/Value fallback: File Device = path  OR  FileDeviceName42 = Something
+FILE_DEVICE_KEY_VALUE_PATTERN = re.compile(
+    r'(?:File\s*Device|FileDeviceName\d+)\s*[:=]\s*"?(?!")([^<>\r\n"]+)"?',
+    re.IGNORECASE,
+)
+# mapp Trak file device for the Scene Viewer SVG data, as parameter or any other notation
+SVG_DATA_DEVICE_PATTERNS = (
+    re.compile(
+        r'Name\s*=\s*"FileDeviceName\d+"\s+Value\s*=\s*"SvgData"', re.IGNORECASE
+    ),
+    re.compile(r'FileDeviceName\d+[^<>\r\n]*Value\s*=\s*"SvgData"', re.IGNORECASE),
+)
+
 
 def check_scene_viewer(apj_path: Path, log, verbose: bool = False):
     """
@@ -21,30 +40,20 @@ def check_scene_viewer(apj_path: Path, log, verbose: bool = False):
     project_root = apj_path.parent
 
     # ---- 2a) mapp Robotics via .objecthierarchy ----
-    for oh_file in project_root.rglob("*.objecthierarchy"):
+    for oh_file in utils.rglob_project_sources(project_root, "*.objecthierarchy"):
         text = utils.read_file(oh_file)
 
-        has_scene_viewer = (
-            re.search(r"Scene\s*Viewer", text, flags=re.IGNORECASE) is not None
-        )
+        has_scene_viewer = SCENE_VIEWER_PATTERN.search(text) is not None
         if not has_scene_viewer:
             continue
 
         values: list[str] = []
 
         # XML-ish: handle ID/Name and any attribute order
-        values += re.findall(
-            r'(?:ID|Name)\s*=\s*"(?:File\s*Device|FileDeviceName\d+)"[^>]*\bValue\s*=\s*"([^"]*)"',
-            text,
-            flags=re.IGNORECASE,
-        )
+        values += FILE_DEVICE_VALUE_PATTERN.findall(text)
 
         # Key/Value fallback: File Device = path  OR  FileDeviceName42 = Something
-        values += re.findall(
-            r'(?:File\s*Device|FileDeviceName\d+)\s*[:=]\s*"?(?!")([^<>\r\n"]+)"?',
-            text,
-            flags=re.IGNORECASE,
-        )
+        values += FILE_DEVICE_KEY_VALUE_PATTERN.findall(text)
 
         values = [v.strip() for v in values if v and v.strip()]
         if values:
@@ -62,18 +71,10 @@ def check_scene_viewer(apj_path: Path, log, verbose: bool = False):
 
     # ---- 2b) mapp Trak via .hw ----
     physical_path = project_root / "Physical"
-    for hw_file in physical_path.rglob("*.hw"):
+    for hw_file in utils.list_files(physical_path, [".hw"]):
         text = utils.read_file(hw_file)
 
-        if re.search(
-            r'Name\s*=\s*"FileDeviceName\d+"\s+Value\s*=\s*"SvgData"',
-            text,
-            flags=re.IGNORECASE,
-        ) or re.search(
-            r'FileDeviceName\d+[^<>\r\n]*Value\s*=\s*"SvgData"',
-            text,
-            flags=re.IGNORECASE,
-        ):
+        if any(pattern.search(text) for pattern in SVG_DATA_DEVICE_PATTERNS):
             _emit_scene_viewer_message(
                 log=log,
                 origin=f"mapp Trak (.hw): {hw_file}",
@@ -84,7 +85,7 @@ def check_scene_viewer(apj_path: Path, log, verbose: bool = False):
     # ---- 1) Fallback: any .scn files in Logical view ----
     logical = project_root / "Logical"
     if logical.exists():
-        scn = next(logical.rglob("*.scn"), None)
+        scn = next(iter(utils.list_files(logical, [".scn"])), None)
         if scn:
             _emit_scene_viewer_message(
                 log=log,
@@ -16,9 +16,8 @@ def warn_inputs(file_path: Path, item_mappings):
     original_content = utils.read_file(file_path)
 
     for old_item, new_item in item_mappings.items():
-        pattern = re.escape(old_item)
-        matches = re.findall(pattern, original_content)
-        if matches:
+        # Plain substring test, no need to collect every match
+        if old_item in original_content:
             utils.log(
                 f"Found usages of '{old_item}', needs replacing with '{new_item}' "
                 "- skipping auto-replacement due to possible functionality change",
@@ -1,10 +1,15 @@
 # Utilities to call in multiple files
 import concurrent.futures
+import functools
 import hashlib
+import itertools
 import json
+import mmap
 import os
+import pickle
 import re
 import sys
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
 from typing import Union, Callable
 
@@ -12,6 +17,32 @@ from CTkMessagebox import CTkMessagebox
 from charset_normalizer import from_path
 
 _CACHED_LINKS = None
+_DISCONTINUATION_INFO = {}  # filename -> discontinuation list, only successful loads
+_SCAN_CACHE = None
+_FILE_INDEX = (
+    None  # root dir -> {extension: [paths]} while enable_file_index() is active
+)
+_PROCESS_POOL = (
+    None  # worker processes shared by the scans while enable_process_pool() is active
+)
+_SCAN_IDS = itertools.count()  # tells the scans on the shared process pool apart
+_WORKER_SCAN = (
+    None  # (scan id, process_functions, args) a worker process unpickled last
+)
+
+# Top-level folders of an Automation Studio project that hold its sources. Generated folders
+# next to them (Temp, Binaries, Diagnosis, ...) can be much larger and are never scanned.
+PROJECT_SOURCE_FOLDERS = ("Logical", "Physical")
+
+# Below this many files, starting worker threads or processes costs more than it saves.
+# Starting the (spawned) worker processes takes ~0.3 s, a source file scan ~3 ms of CPU.
+PARALLEL_MIN_FILES = 32
+PROCESS_POOL_MIN_FILES = 256
+# Thread scans mostly wait for open/read, more threads than cores keep slow (network) drives busy
+SCAN_THREAD_WORKERS = min(64, (os.cpu_count() or 1) * 8)
+
+# Value attribute of a configuration line, e.g. <Property ID="Url" Value="opc.tcp://..." />
+VALUE_PATTERN = re.compile(r'Value="([^"]+)"')
 
 
 class ConsoleColors:
@@ -123,11 +154,14 @@ def log(message, log_file=None, when="", severity=""):
         console_message = message
         file_message = message
 
-    # Print to console with colors (with newline at start)
-    print(
-        f"\n{console_message}",
-        file=(sys.stderr if severity.upper() == "ERROR" else sys.stdout),
-    )
+    # Write to console with colors (with newline at start) in a single call.
+    # Errors go to stderr and are flushed right away so they are not held back behind stdout.
+    # The stream can be None in a windowed (no console) executable.
+    stream = sys.stderr if severity.upper() == "ERROR" else sys.stdout
+    if stream is not None:
+        stream.write(f"\n{console_message}\n")
+        if stream is sys.stderr:
+            stream.flush()
     if log_file:
         log_file.write(file_message + "\n")  # Write to file without colors
         log_file.flush()  # Ensure data is written immediately
@@ -158,6 +192,27 @@ def get_and_check_project_file(project_path):
     return os.path.basename(apj_file)
 
 
+def rglob_project_sources(project_path, pattern):
+    """
+    Recursively yields the files matching pattern in the source folders of the project.
+    Use this instead of project_path.rglob() to avoid walking generated build output.
+    """
+    project_path = Path(project_path)
+    for folder in PROJECT_SOURCE_FOLDERS:
+        source_path = project_path / folder
+        if source_path.is_dir():
+            yield from source_path.rglob(pattern)
+
+
+@functools.lru_cache(maxsize=1024)
+def parent_folder_name(file_path: str) -> str:
+    """
+    Returns the name of the folder containing a file, e.g. the hardware configuration of a .hw file.
+    Memoized as many results usually come from the same few files.
+    """
+    return os.path.basename(os.path.dirname(file_path))
+
+
 def calculate_file_hash(file_path):
     """
     Calculates the hash (MD5) of a file for comparison purposes.
@@ -216,11 +271,158 @@ def ask_user_gui(message: str, extra_note: str = "") -> bool:
     return response == "Yes"
 
 
+class ScanCache:
+    """
+    Per-file results of scan_files_parallel from a previous run, stored as JSON.
+    An entry is reused while the file's modification time and size, the scan's functions,
+    arguments and cache_version and the tool version are unchanged.
+    Source checkouts all report the version "dev", so the cache_version of a scan is what
+    invalidates its entries when the logic of its functions changes.
+    """
+
+    def __init__(self, cache_file: Path):
+        self.cache_file = cache_file
+        self.entries = {}
+        self.used = {}
+        self.stats = {}
+        try:
+            with cache_file.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == get_version():
+                self.entries = data["entries"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass  # No usable cache yet, start empty
+
+    @staticmethod
+    def scan_key(process_functions, args, cache_version):
+        names = ",".join(f"{f.__module__}.{f.__qualname__}" for f in process_functions)
+        arguments = json.dumps(args, sort_keys=True, default=str).encode()
+        digest = hashlib.blake2b(arguments, digest_size=8).hexdigest()
+        return f"{names}@{cache_version}:{digest}"
+
+    def get(self, scan_key, file):
+        key = f"{scan_key}|{file}"
+        try:
+            stat = os.stat(file)
+        except OSError:
+            return None
+        entry = self.entries.get(key)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            self.used[key] = entry
+            return {name: _as_tuples(result) for name, result in entry[2].items()}
+        # Remember the state the file had before it is scanned
+        self.stats[key] = (stat.st_mtime_ns, stat.st_size)
+        return None
+
+    def store(self, scan_key, file, func_results):
+        key = f"{scan_key}|{file}"
+        if key in self.stats:
+            self.used[key] = [*self.stats.pop(key), func_results]
+
+    def save(self):
+        # Only entries of this run are kept, so deleted files and old scans drop out
+        with self.cache_file.open("w", encoding="utf-8") as f:
+            json.dump({"version": get_version(), "entries": self.used}, f)
+
+
+def _as_tuples(value):
+    # JSON turns the result tuples into lists, restore them
+    if isinstance(value, list):
+        return tuple(_as_tuples(item) for item in value)
+    return value
+
+
+def enable_scan_cache(cache_file: Path):
+    """
+    Lets scan_files_parallel reuse results stored in cache_file until save_scan_cache() is called.
+    """
+    global _SCAN_CACHE
+    _SCAN_CACHE = ScanCache(cache_file)
+
+
+def save_scan_cache():
+    """
+    Writes and disables the cache enabled by enable_scan_cache().
+    """
+    global _SCAN_CACHE
+    cache, _SCAN_CACHE = _SCAN_CACHE, None
+    if cache is None:
+        return
+    try:
+        cache.save()
+    except (OSError, TypeError, ValueError) as e:
+        log(f"Failed to write scan cache '{cache.cache_file}': {e}", severity="WARNING")
+
+
+def enable_file_index():
+    """
+    Lets list_files walk each root directory only once until disable_file_index() is called.
+    Meant for a single analyzer run, during which the project files do not change.
+    """
+    global _FILE_INDEX
+    _FILE_INDEX = {}
+
+
+def disable_file_index():
+    global _FILE_INDEX
+    _FILE_INDEX = None
+
+
+def enable_process_pool():
+    """
+    Lets scan_files_parallel run CPU-bound scans on one set of worker processes until
+    shutdown_process_pool() is called. The workers only start with the first scan that needs them.
+    With a single CPU there is nothing to gain and the scans stay on threads. The frozen
+    (PyInstaller) GUI build also stays on threads, it runs the analyzer in a worker thread.
+    """
+    global _PROCESS_POOL
+    if (os.cpu_count() or 1) > 1 and not getattr(sys, "frozen", False):
+        _PROCESS_POOL = concurrent.futures.ProcessPoolExecutor()
+
+
+def shutdown_process_pool():
+    global _PROCESS_POOL
+    pool, _PROCESS_POOL = _PROCESS_POOL, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def _index_files(root_dir, extensions=None):
+    # Walk the tree once and bucket the files by lowercase extension, keeping the walk order
+    files_by_ext = {}
+    for dir_path, _, file_names in os.walk(root_dir):
+        for file_name in file_names:
+            ext = os.path.splitext(file_name)[1].lower()
+            if extensions is None or ext in extensions:
+                files_by_ext.setdefault(ext, []).append(
+                    os.path.join(dir_path, file_name)
+                )
+    return files_by_ext
+
+
+def list_files(root_dir, extensions) -> list[str]:
+    """
+    Lists the paths of all files below root_dir with one of the given extensions (case-insensitive),
+    grouped by extension in the given order.
+    """
+    extensions = list(dict.fromkeys(ext.lower() for ext in extensions))
+    if _FILE_INDEX is None:
+        files_by_ext = _index_files(root_dir, set(extensions))
+    else:
+        key = os.path.abspath(root_dir)
+        if key not in _FILE_INDEX:
+            _FILE_INDEX[key] = _index_files(root_dir)
+        files_by_ext = _FILE_INDEX[key]
+    return [file for ext in extensions for file in files_by_ext.get(ext, ())]
+
+
 def scan_files_parallel(
     root_dir: Path,
     extensions: list,
     process_functions: Union[Callable, list[Callable]],
     *args,
+    use_processes=False,
+    cache_version=None,
 ):
     """
     Scans files in a directory tree in parallel for specific content.
@@ -230,6 +432,12 @@ def scan_files_parallel(
         extensions (list): File extensions to include.
         process_functions (callable or list): The function to apply on each file.
         *args: Additional arguments to pass to the process_function.
+        use_processes (bool): Use the worker processes of enable_process_pool() for CPU-bound
+            functions on large trees. The functions and arguments must then be picklable
+            (module-level functions, plain data).
+        cache_version (int): Logic version of the process functions. Only scans with a
+            cache_version use the --cache results, bump it whenever the results of the
+            functions change. The functions must only depend on the scanned file itself.
 
     Returns:
         dict or list: Aggregated results from all scanned files.
@@ -240,15 +448,53 @@ def scan_files_parallel(
 
     results = {func.__name__: [] for func in process_functions}
 
-    files = []
-    for ext in extensions:
-        files.extend(str(p) for p in root_dir.rglob(f"*{ext}") if p.is_file())
-
-    def process_file(path):
-        return {func.__name__: func(path, *args) for func in process_functions}
+    files = list_files(root_dir, extensions)
 
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        for func_results in executor.map(process_file, files):
+    cache = _SCAN_CACHE if cache_version is not None else None
+    if cache is not None:
+        scan_key = cache.scan_key(process_functions, args, cache_version)
+        cached_results = [cache.get(scan_key, file) for file in files]
+    else:
+        cached_results = [None] * len(files)
+    pending = [file for file, cached in zip(files, cached_results) if cached is None]
+
+    process_file = functools.partial(_process_file, process_functions, args)
+    if len(pending) < PARALLEL_MIN_FILES:
+        # Scan a handful of files right here
+        executor = None
+    elif (
+        use_processes
+        and _PROCESS_POOL is not None
+        and len(pending) >= PROCESS_POOL_MIN_FILES
+    ):
+        # The shared pool outlives this scan, it is not shut down here. The functions and
+        # arguments are pickled once and each worker unpickles them once per scan.
+        executor = _PROCESS_POOL
+        scan = (next(_SCAN_IDS), pickle.dumps((process_functions, args)))
+        chunksize = 32
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=SCAN_THREAD_WORKERS
+        )
+        chunksize = 1
+
+    with nullcontext() if executor in (None, _PROCESS_POOL) else executor:
+        if executor is None:
+            computed = map(process_file, pending)
+        elif executor is _PROCESS_POOL:
+            chunks = [
+                pending[i : i + chunksize] for i in range(0, len(pending), chunksize)
+            ]
+            computed = itertools.chain.from_iterable(
+                executor.map(_process_files_in_worker, itertools.repeat(scan), chunks)
+            )
+        else:
+            computed = executor.map(process_file, pending, chunksize=chunksize)
+        for file, func_results in zip(files, cached_results):
+            if func_results is None:
+                func_results = next(computed)
+                if cache is not None:
+                    cache.store(scan_key, file, func_results)
             for func_name, result in func_results.items():
                 results[func_name].extend(result)
 
@@ -259,22 +505,65 @@ def scan_files_parallel(
         return results
 
 
+def _process_file(process_functions, args, path):
+    return {func.__name__: func(path, *args) for func in process_functions}
+
+
+def _process_files_in_worker(scan, paths):
+    # Runs a chunk of a scan in a worker of the shared pool, see scan_files_parallel()
+    global _WORKER_SCAN
+    scan_id, payload = scan
+    if _WORKER_SCAN is None or _WORKER_SCAN[0] != scan_id:
+        _WORKER_SCAN = (scan_id, *pickle.loads(payload))
+    _, process_functions, args = _WORKER_SCAN
+    return [_process_file(process_functions, args, path) for path in paths]
+
+
 def load_discontinuation_info(filename):
-    return load_file_info("discontinuations", filename)
+    """
+    Loads a discontinuation list on first use; later calls return the same (read-only) dict.
+    A failed load is not kept, the next call tries again.
+    """
+    info = _DISCONTINUATION_INFO.get(filename)
+    if info is None:
+        info = load_file_info("discontinuations", filename)
+        if info:
+            _DISCONTINUATION_INFO[filename] = info
+    return info
+
+
+@functools.lru_cache(maxsize=None)
+def _read_info_file(folder, filename):
+    """
+    Reads a bundled JSON file once, errors are not cached.
+    """
+    root_path = Path(__file__).resolve().parent.parent
+    file_dir = root_path / folder
+    file_path = file_dir / f"{filename}.json"
+    with file_path.open("r", encoding="utf-8") as json_file:
+        return json_file.read()
 
 
 def load_file_info(folder, filename):
+    """
+    Returns a fresh copy of a bundled JSON file, callers may modify it (e.g. the license counters).
+    """
     try:
-        root_path = Path(__file__).resolve().parent.parent
-        file_dir = root_path / folder
-        file_path = file_dir / f"{filename}.json"
-        with file_path.open("r", encoding="utf-8") as json_file:
-            return json.load(json_file)
+        # Parsing the cached text is cheaper than deep-copying a cached object
+        return json.loads(_read_info_file(folder, filename))
     except Exception as e:
         log(f"Error loading JSON file '{filename}': {e}", severity="ERROR")
         return {}
 
 
+def case_insensitive_lookup(mapping, suffix=""):
+    """
+    Builds a lowercase key -> (original key, value) dict so names found in
+    project files can be matched with a single lookup.
+    """
+    return {f"{key.lower()}{suffix}": (key, value) for key, value in mapping.items()}
+
+
 def build_web_path(links, url):
     path_web = "https://www.br-automation.com/en"
     path_help = "https://help.br-automation.com/#/en/6"
@@ -321,16 +610,37 @@ def build_web_path(links, url):
     return f"{path_web}/product/{url}"
 
 
-def read_file(file: Path):
+def read_file(file: Union[str, Path]):
     try:
-        return file.read_text(encoding="utf-8", errors="ignore")
+        with open(file, encoding="utf-8", errors="ignore") as f:
+            return f.read()
     except Exception:
         result = from_path(file).best()
         if result:
-            return file.read_text(encoding=result.encoding, errors="ignore")
+            with open(file, encoding=result.encoding, errors="ignore") as f:
+                return f.read()
     return ""
 
 
+@contextmanager
+def map_file(file: Union[str, Path]):
+    """
+    Maps a file read-only into memory so bytes patterns can search it without decoding.
+    Yields b"" for empty or unreadable files.
+    """
+    try:
+        with open(file, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        yield b""
+        return
+    with mapped:
+        # Scans read front to back, let the kernel read ahead (not available on Windows)
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        yield mapped
+
+
 def file_value_count(file_path: Path, pairs):
     for line in read_file(file_path).splitlines():
         for obj in pairs:
@@ -341,13 +651,18 @@ def file_value_count(file_path: Path, pairs):
 
 
 def file_value_by_id(file_path: Path, ids):
+    """
+    Reads the file once and returns the Value of every line mentioning one of the ids.
+    """
     result = []
     for line in read_file(file_path).splitlines():
-        for item in ids:
-            if item in line:
-                match = re.search(r'Value="([^"]+)"', line)
-                if match:
-                    result.append({"name": item, "value": match.group(1)})
+        names = [item for item in ids if item in line]
+        if not names:
+            continue
+        # Search the value once per line, even if several ids are on it
+        match = VALUE_PATTERN.search(line)
+        if match:
+            result.extend({"name": item, "value": match.group(1)} for item in names)
 
     return result
 